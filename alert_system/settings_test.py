@@ -0,0 +1,28 @@
+"""
+Settings for running the test suite.
+
+Usage: python manage.py test --settings=alert_system.settings_test
+
+Runs against in-memory SQLite regardless of USE_SQLITE/REDIS_URL, so no
+database files are created or fsynced. PostgreSQL-only migration steps are
+already skipped on other vendors.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
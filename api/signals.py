@@ -0,0 +1,28 @@
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from community.models import Alert, AlertCategory, Community, CustomUser
+
+from .views import CATEGORIES_CACHE_KEY, COMMUNITIES_CACHE_KEY
+
+
+@receiver([post_save, post_delete], sender=AlertCategory)
+def invalidate_categories_payload(sender, **kwargs):
+    cache.delete(CATEGORIES_CACHE_KEY)
+
+
+@receiver([post_save, post_delete], sender=Community)
+def invalidate_communities_payload(sender, **kwargs):
+    cache.delete(COMMUNITIES_CACHE_KEY)
+
+
+@receiver(m2m_changed, sender=CustomUser.communities.through)
+def invalidate_member_counts(sender, **kwargs):
+    cache.delete(COMMUNITIES_CACHE_KEY)
+
+
+@receiver([post_save, post_delete], sender=Alert)
+def invalidate_alert_counts(sender, **kwargs):
+    # Both payloads carry per-row public alert counts
+    cache.delete_many([CATEGORIES_CACHE_KEY, COMMUNITIES_CACHE_KEY])
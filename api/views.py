@@ -1,73 +1,136 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Q, F
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+import hashlib
 import json
-from decimal import Decimal
 
-from community.models import Alert, AlertCategory, Community, CustomUser, AlertVote
+import orjson
 
+from community.models import Alert, AlertCategory, AlertComment, AlertMedia, Community, CustomUser, AlertVote
+from community.pagination import CachedCountPaginator, count_cache_key
+from community.search import search_alerts
+from community.stats import public_alerts_version
+from community.view_counts import pending_views, record_alert_view
 
-def alert_to_dict(alert):
-    """Convert Alert model to dictionary for JSON response"""
+
+def ojson(data, status=200):
+    """JSON response encoded with orjson for the high-traffic endpoints"""
+    return HttpResponse(orjson.dumps(data), status=status, content_type='application/json')
+
+
+def with_alert_counts(alerts):
+    """Annotate media and visible comment counts onto an Alert queryset"""
+    return alerts.annotate(
+        _media_count=Count('media', distinct=True),
+        _comments_count=Count('comments', filter=Q(comments__is_deleted=False), distinct=True)
+    )
+
+
+def count_subquery(queryset, field):
+    """Correlated COUNT of ``queryset`` rows whose ``field`` is the outer row, 0 if none"""
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+# Flat columns serialized by alert_row_to_dict; the counts come from with_alert_counts
+ALERT_VALUES_FIELDS = (
+    'id', 'title', 'description', 'severity', 'status', 'address',
+    'incident_datetime', 'created_at', 'updated_at',
+    'view_count', 'upvotes', 'downvotes', 'is_public', 'is_verified',
+    'category_id', 'category__name', 'category__icon', 'category__color',
+    'community_id', 'community__name',
+    'created_by_id', 'created_by__username', 'created_by__first_name', 'created_by__last_name',
+    '_media_count', '_comments_count',
+)
+
+
+def alert_row_to_dict(row):
+    """
+    Serialize an alert from a with_alert_counts(...).values(*ALERT_VALUES_FIELDS)
+    row, so no model instances are created. UUIDs and datetimes are left for
+    orjson to encode.
+    """
     return {
-        'id': str(alert.id),
-        'title': alert.title,
-        'description': alert.description,
+        'id': row['id'],
+        'title': row['title'],
+        'description': row['description'],
         'category': {
-            'id': alert.category.id,
-            'name': alert.category.name,
-            'icon': alert.category.icon,
-            'color': alert.category.color
+            'id': row['category_id'],
+            'name': row['category__name'],
+            'icon': row['category__icon'],
+            'color': row['category__color']
         },
-        'severity': alert.severity,
-        'status': alert.status,
-        'latitude': str(alert.latitude),
-        'longitude': str(alert.longitude),
-        'address': alert.address,
+        'severity': row['severity'],
+        'status': row['status'],
+        'address': row['address'],
         'community': {
-            'id': str(alert.community.id),
-            'name': alert.community.name
+            'id': row['community_id'],
+            'name': row['community__name']
         },
         'created_by': {
-            'id': alert.created_by.id,
-            'username': alert.created_by.username,
-            'full_name': alert.created_by.get_full_name()
+            'id': row['created_by_id'],
+            'username': row['created_by__username'],
+            'full_name': f"{row['created_by__first_name']} {row['created_by__last_name']}".strip()
         },
-        'incident_datetime': alert.incident_datetime.isoformat(),
-        'created_at': alert.created_at.isoformat(),
-        'updated_at': alert.updated_at.isoformat(),
-        'view_count': alert.view_count,
-        'upvotes': alert.upvotes,
-        'downvotes': alert.downvotes,
-        'is_public': alert.is_public,
-        'is_verified': alert.is_verified,
-        'media_count': alert.media.count(),
-        'comments_count': alert.comments.filter(is_deleted=False).count()
+        'incident_datetime': row['incident_datetime'],
+        'created_at': row['created_at'],
+        'updated_at': row['updated_at'],
+        'view_count': row['view_count'],
+        'upvotes': row['upvotes'],
+        'downvotes': row['downvotes'],
+        'is_public': row['is_public'],
+        'is_verified': row['is_verified'],
+        'media_count': row['_media_count'],
+        'comments_count': row['_comments_count']
     }
 
 
+def alert_rows(alerts):
+    """.values() rows of an Alert queryset, ready for alert_row_to_dict"""
+    return with_alert_counts(alerts).values(*ALERT_VALUES_FIELDS)
+
+
+def add_pending_views(alerts_data):
+    """Fold view counts still buffered in Redis into serialized alerts"""
+    pending = pending_views([alert['id'] for alert in alerts_data])
+    for alert in alerts_data:
+        alert['view_count'] += pending.get(str(alert['id']), 0)
+    return alerts_data
+
+
 def community_to_dict(community):
     """Convert Community model to dictionary for JSON response"""
+    member_count = getattr(community, '_member_count', None)
+    if member_count is None:
+        member_count = community.members.count()
+    alert_count = getattr(community, '_alert_count', None)
+    if alert_count is None:
+        alert_count = community.alerts.filter(is_public=True).count()
+
     return {
         'id': str(community.id),
         'name': community.name,
         'description': community.description,
-        'latitude': str(community.latitude),
-        'longitude': str(community.longitude),
-        'radius_km': community.radius_km,
         'created_at': community.created_at.isoformat(),
         'is_active': community.is_active,
-        'member_count': community.members.count(),
-        'alert_count': community.alerts.filter(is_public=True).count()
+        'member_count': member_count,
+        'alert_count': alert_count
     }
 
 
-def user_to_dict(user):
+def user_to_dict(user, community_ids=None):
     """Convert User model to dictionary for JSON response"""
+    if community_ids is None:
+        community_ids = user.communities.values_list('id', flat=True)
+
     return {
         'id': user.id,
         'username': user.username,
@@ -75,11 +138,22 @@ def user_to_dict(user):
         'full_name': user.get_full_name(),
         'role': user.role,
         'created_at': user.created_at.isoformat(),
-        'communities': [str(c.id) for c in user.communities.all()]
+        'communities': [str(community_id) for community_id in community_ids]
     }
 
 
+def alerts_list_etag(request, *args, **kwargs):
+    # The version moves on every alert save/delete and vote, comment or media change
+    key = f"{public_alerts_version().isoformat()}:{request.GET.urlencode()}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def alerts_list_last_modified(request, *args, **kwargs):
+    return public_alerts_version()
+
+
 @require_http_methods(["GET"])
+@condition(etag_func=alerts_list_etag, last_modified_func=alerts_list_last_modified)
 def api_alerts_list(request):
     """API endpoint for listing alerts with filtering and pagination"""
     try:
@@ -93,11 +167,10 @@ def api_alerts_list(request):
         status = request.GET.get('status')
         community_id = request.GET.get('community')
         search = request.GET.get('search')
+        sort = request.GET.get('sort')
         
         # Base queryset
-        alerts = Alert.objects.filter(is_public=True).select_related(
-            'category', 'community', 'created_by'
-        ).order_by('-created_at')
+        alerts = Alert.objects.filter(is_public=True).order_by('-created_at')
         
         # Apply filters
         if category_id:
@@ -109,20 +182,28 @@ def api_alerts_list(request):
         if community_id:
             alerts = alerts.filter(community_id=community_id)
         if search:
-            alerts = alerts.filter(
-                Q(title__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(address__icontains=search)
-            )
-        
-        # Pagination
-        paginator = Paginator(alerts, page_size)
+            alerts = search_alerts(alerts, search)
+        if sort == 'severity':
+            alerts = alerts.by_severity()
+        
+        # Pagination (the total is cached per filter combination until an alert changes)
+        filters = {
+            'category': category_id,
+            'severity': severity,
+            'status': status,
+            'community': community_id,
+            'search': search
+        }
+        paginator = CachedCountPaginator(
+            alert_rows(alerts), page_size,
+            count_cache_key('alerts_count', filters, public_alerts_version())
+        )
         page_obj = paginator.get_page(page)
         
         # Convert to JSON format
-        alerts_data = [alert_to_dict(alert) for alert in page_obj]
+        alerts_data = add_pending_views([alert_row_to_dict(row) for row in page_obj])
         
-        return JsonResponse({
+        return ojson({
             'success': True,
             'data': alerts_data,
             'pagination': {
@@ -133,17 +214,11 @@ def api_alerts_list(request):
                 'has_next': page_obj.has_next(),
                 'has_previous': page_obj.has_previous()
             },
-            'filters': {
-                'category': category_id,
-                'severity': severity,
-                'status': status,
-                'community': community_id,
-                'search': search
-            }
+            'filters': filters
         })
         
     except Exception as e:
-        return JsonResponse({
+        return ojson({
             'success': False,
             'error': str(e)
         }, status=500)
@@ -153,18 +228,9 @@ def api_alerts_list(request):
 def api_alert_detail(request, alert_id):
     """API endpoint for getting alert details"""
     try:
-        alert = Alert.objects.select_related(
-            'category', 'community', 'created_by'
-        ).prefetch_related('media', 'comments').get(
-            id=alert_id, 
-            is_public=True
-        )
-        
-        # Increment view count
-        Alert.objects.filter(id=alert_id).update(view_count=F('view_count') + 1)
+        alert_data = alert_row_to_dict(alert_rows(Alert.objects.filter(id=alert_id, is_public=True)).get())
         
         # Get comments
-        comments = alert.comments.filter(is_deleted=False).select_related('user').order_by('created_at')
         comments_data = [{
             'id': comment.id,
             'content': comment.content,
@@ -174,7 +240,9 @@ def api_alert_detail(request, alert_id):
             },
             'created_at': comment.created_at.isoformat(),
             'updated_at': comment.updated_at.isoformat()
-        } for comment in comments]
+        } for comment in AlertComment.objects.filter(
+            alert_id=alert_id, is_deleted=False
+        ).select_related('user').order_by('created_at')]
         
         # Get media
         media_data = [{
@@ -183,41 +251,78 @@ def api_alert_detail(request, alert_id):
             'file_url': media.file.url if media.file else None,
             'caption': media.caption,
             'uploaded_at': media.uploaded_at.isoformat()
-        } for media in alert.media.all()]
+        } for media in AlertMedia.objects.filter(alert_id=alert_id)]
         
-        alert_data = alert_to_dict(alert)
+        alert_data = add_pending_views([alert_data])[0]
         alert_data['comments'] = comments_data
         alert_data['media'] = media_data
         
-        return JsonResponse({
+        # Count the view once the payload is built; inside a transaction
+        # the write is deferred until commit
+        transaction.on_commit(lambda: record_alert_view(alert_id))
+        
+        return ojson({
             'success': True,
             'data': alert_data
         })
         
     except Alert.DoesNotExist:
-        return JsonResponse({
+        return ojson({
             'success': False,
             'error': 'Alert not found'
         }, status=404)
     except Exception as e:
-        return JsonResponse({
+        return ojson({
             'success': False,
             'error': str(e)
         }, status=500)
 
 
+# Serialized category/community payloads; invalidated by api.signals
+CATEGORIES_CACHE_KEY = 'api:categories:v1'
+COMMUNITIES_CACHE_KEY = 'api:communities:v1'
+LIST_CACHE_TIMEOUT = 3600
+
+
+def build_communities_payload():
+    """Build the JSON body for api_communities_list"""
+    # Separate subqueries, so members and alerts aren't joined against each other
+    communities = Community.objects.filter(is_active=True).annotate(
+        _member_count=count_subquery(CustomUser.communities.through.objects.all(), 'community'),
+        _alert_count=count_subquery(Alert.objects.filter(is_public=True), 'community')
+    ).order_by('name')
+    
+    return orjson.dumps({
+        'success': True,
+        'data': [community_to_dict(community) for community in communities.iterator(chunk_size=500)]
+    })
+
+
+def build_categories_payload():
+    """Build the JSON body for api_categories_list"""
+    categories = AlertCategory.objects.filter(is_active=True).annotate(
+        alert_count=Count('alerts', filter=Q(alerts__is_public=True))
+    ).order_by('name')
+    
+    return orjson.dumps({
+        'success': True,
+        'data': [{
+            'id': category.id,
+            'name': category.name,
+            'description': category.description,
+            'icon': category.icon,
+            'color': category.color,
+            'alert_count': category.alert_count
+        } for category in categories.iterator(chunk_size=500)]
+    })
+
+
 @require_http_methods(["GET"])
 def api_communities_list(request):
     """API endpoint for listing communities"""
     try:
-        communities = Community.objects.filter(is_active=True).order_by('name')
-        
-        communities_data = [community_to_dict(community) for community in communities]
-        
-        return JsonResponse({
-            'success': True,
-            'data': communities_data
-        })
+        body = cache.get_or_set(COMMUNITIES_CACHE_KEY, build_communities_payload, LIST_CACHE_TIMEOUT)
+        return HttpResponse(body, content_type='application/json')
         
     except Exception as e:
         return JsonResponse({
@@ -230,21 +335,8 @@ def api_communities_list(request):
 def api_categories_list(request):
     """API endpoint for listing alert categories"""
     try:
-        categories = AlertCategory.objects.filter(is_active=True).order_by('name')
-        
-        categories_data = [{
-            'id': category.id,
-            'name': category.name,
-            'description': category.description,
-            'icon': category.icon,
-            'color': category.color,
-            'alert_count': category.alerts.filter(is_public=True).count()
-        } for category in categories]
-        
-        return JsonResponse({
-            'success': True,
-            'data': categories_data
-        })
+        body = cache.get_or_set(CATEGORIES_CACHE_KEY, build_categories_payload, LIST_CACHE_TIMEOUT)
+        return HttpResponse(body, content_type='application/json')
         
     except Exception as e:
         return JsonResponse({
@@ -261,13 +353,13 @@ def api_community_alerts(request):
         user = request.user
         
         # Get alerts from user's communities
-        alerts = Alert.objects.filter(
+        alerts = alert_rows(Alert.objects.filter(
             community__in=user.communities.all(),
             is_public=True,
             status='active'
-        ).select_related('category', 'community', 'created_by').order_by('-created_at')
+        ).order_by('-created_at'))
         
-        alerts_data = [alert_to_dict(alert) for alert in alerts]
+        alerts_data = add_pending_views([alert_row_to_dict(row) for row in alerts])
         
         # Get user's communities
         user_communities = [
@@ -275,7 +367,7 @@ def api_community_alerts(request):
             for c in user.communities.filter(is_active=True)
         ]
         
-        return JsonResponse({
+        return ojson({
             'success': True,
             'data': alerts_data,
             'user_communities': user_communities
@@ -298,7 +390,7 @@ def api_create_alert(request):
         
         # Validate required fields
         required_fields = ['title', 'description', 'category_id', 'severity', 
-                          'latitude', 'longitude', 'community_id', 'incident_datetime']
+                          'community_id', 'incident_datetime']
         
         for field in required_fields:
             if field not in data:
@@ -309,7 +401,9 @@ def api_create_alert(request):
         
         # Validate category and community exist
         try:
-            category = AlertCategory.objects.get(id=data['category_id'], is_active=True)
+            category = AlertCategory.get_cached(data['category_id'])
+            if not category.is_active:
+                raise AlertCategory.DoesNotExist
             community = Community.objects.get(id=data['community_id'], is_active=True)
         except (AlertCategory.DoesNotExist, Community.DoesNotExist):
             return JsonResponse({
@@ -324,8 +418,6 @@ def api_create_alert(request):
             category=category,
             severity=data['severity'],
             status=data.get('status', 'active'),
-            latitude=Decimal(str(data['latitude'])),
-            longitude=Decimal(str(data['longitude'])),
             address=data.get('address', ''),
             community=community,
             created_by=request.user,
@@ -333,9 +425,9 @@ def api_create_alert(request):
             is_public=data.get('is_public', True)
         )
         
-        return JsonResponse({
+        return ojson({
             'success': True,
-            'data': alert_to_dict(alert)
+            'data': alert_row_to_dict(alert_rows(Alert.objects.filter(pk=alert.pk)).get())
         }, status=201)
         
     except json.JSONDecodeError:
@@ -356,22 +448,24 @@ def api_user_profile(request):
     """API endpoint for getting user profile"""
     try:
         user = request.user
-        user_data = user_to_dict(user)
+        community_ids = list(user.communities.values_list('id', flat=True))
+        user_data = user_to_dict(user, community_ids)
+        
+        # Both activity counts in one query, as subqueries so the two relations aren't joined together
+        activity = CustomUser.objects.filter(pk=user.pk).values(
+            alerts_created=count_subquery(Alert.objects.all(), 'created_by'),
+            alerts_voted=count_subquery(AlertVote.objects.all(), 'user')
+        ).get()
         
         # Add additional profile data
         user_data.update({
             'notification_preferences': {
                 'email_notifications': user.email_notifications,
-                'push_notifications': user.push_notifications,
-                'notification_radius_km': user.notification_radius_km
-            },
-            'location': {
-                'latitude': str(user.latitude) if user.latitude else None,
-                'longitude': str(user.longitude) if user.longitude else None
+                'push_notifications': user.push_notifications
             },
             'stats': {
-                'alerts_created': user.created_alerts.count(),
-                'alerts_voted': user.alertvote_set.count()
+                'alerts_created': activity['alerts_created'],
+                'alerts_voted': activity['alerts_voted']
             }
         })
         
@@ -387,35 +481,53 @@ def api_user_profile(request):
         }, status=500)
 
 
+STATS_CACHE_KEY = 'api_stats_v1'
+STATS_CACHE_TIMEOUT = 300  # Stats don't need second-level accuracy
+
+
+def compute_stats():
+    """Build the system statistics payload"""
+    # One pass over the public alerts for every alert-level count
+    counts = Alert.objects.filter(is_public=True).aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status='active')),
+        resolved=Count('id', filter=Q(status='resolved')),
+        low=Count('id', filter=Q(severity='low')),
+        medium=Count('id', filter=Q(severity='medium')),
+        high=Count('id', filter=Q(severity='high')),
+        critical=Count('id', filter=Q(severity='critical')),
+        recent=Count('id', filter=Q(created_at__gte=timezone.now() - timezone.timedelta(days=7)))
+    )
+    
+    return {
+        'total_alerts': counts['total'],
+        'active_alerts': counts['active'],
+        'resolved_alerts': counts['resolved'],
+        'total_communities': Community.objects.filter(is_active=True).count(),
+        'total_users': CustomUser.objects.filter(is_active=True).count(),
+        'alerts_by_severity': {
+            'low': counts['low'],
+            'medium': counts['medium'],
+            'high': counts['high'],
+            'critical': counts['critical']
+        },
+        'recent_alerts': counts['recent']
+    }
+
+
 @require_http_methods(["GET"])
 def api_stats(request):
     """API endpoint for getting system statistics"""
     try:
-        stats = {
-            'total_alerts': Alert.objects.filter(is_public=True).count(),
-            'active_alerts': Alert.objects.filter(is_public=True, status='active').count(),
-            'resolved_alerts': Alert.objects.filter(is_public=True, status='resolved').count(),
-            'total_communities': Community.objects.filter(is_active=True).count(),
-            'total_users': CustomUser.objects.filter(is_active=True).count(),
-            'alerts_by_severity': {
-                'low': Alert.objects.filter(is_public=True, severity='low').count(),
-                'medium': Alert.objects.filter(is_public=True, severity='medium').count(),
-                'high': Alert.objects.filter(is_public=True, severity='high').count(),
-                'critical': Alert.objects.filter(is_public=True, severity='critical').count()
-            },
-            'recent_alerts': Alert.objects.filter(
-                is_public=True, 
-                created_at__gte=timezone.now() - timezone.timedelta(days=7)
-            ).count()
-        }
+        stats = cache.get_or_set(STATS_CACHE_KEY, compute_stats, STATS_CACHE_TIMEOUT)
         
-        return JsonResponse({
+        return ojson({
             'success': True,
             'data': stats
         })
         
     except Exception as e:
-        return JsonResponse({
+        return ojson({
             'success': False,
             'error': str(e)
         }, status=500)
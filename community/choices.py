@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.forms.models import ModelChoiceIterator
+
+from .models import AlertCategory, Community
+
+ACTIVE_CATEGORIES_CACHE_KEY = 'choices:active_categories:v1'
+ACTIVE_COMMUNITIES_CACHE_KEY = 'choices:active_communities:v1'
+CHOICES_CACHE_TIMEOUT = 120
+
+
+def active_categories():
+    """Cached id/name rows for active alert categories"""
+    return cache.get_or_set(
+        ACTIVE_CATEGORIES_CACHE_KEY,
+        lambda: list(AlertCategory.objects.filter(is_active=True).values('id', 'name')),
+        CHOICES_CACHE_TIMEOUT
+    )
+
+
+def active_communities():
+    """Cached id/name/description rows for active communities"""
+    return cache.get_or_set(
+        ACTIVE_COMMUNITIES_CACHE_KEY,
+        lambda: list(Community.objects.filter(is_active=True).values('id', 'name', 'description')),
+        CHOICES_CACHE_TIMEOUT
+    )
+
+
+def invalidate_choices():
+    cache.delete_many([ACTIVE_CATEGORIES_CACHE_KEY, ACTIVE_COMMUNITIES_CACHE_KEY])
+
+
+class CachedModelChoiceIterator(ModelChoiceIterator):
+    """
+    Yield choices from the field's cached rows instead of iterating the
+    queryset. Cleaning a submitted value still goes through the queryset.
+    """
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for row in self.field.rows():
+            yield (row['id'], row['name'])
+
+    def __len__(self):
+        return len(self.field.rows()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.rows())
+
+
+def use_cached_choices(field, rows):
+    """Render a model choice field from a rows() callable"""
+    field.rows = rows
+    field.iterator = CachedModelChoiceIterator
+    field.widget.choices = field.choices
@@ -1,4 +1,5 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import Http404, JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 
@@ -7,6 +8,9 @@ from django.views.decorators.csrf import csrf_exempt
 @csrf_exempt
 def debug_headers(request):
     """Debug endpoint to check request headers"""
+    if not settings.DEBUG:
+        raise Http404()
+    
     return JsonResponse({
         'method': request.method,
         'content_type': request.content_type,
@@ -1,24 +1,28 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from .models import CustomUser, Alert, AlertCategory, Community
+from .choices import active_categories, active_communities, use_cached_choices
+
+# Upload limits for AlertMediaForm
+MAX_MEDIA_BYTES = 50 * 1024 * 1024  # 50MB
+ALLOWED_MEDIA_TYPES = frozenset({
+    'image/jpeg', 'image/png', 'image/gif',
+    'video/mp4', 'video/webm', 'video/quicktime'
+})
 
 
 class UserRegistrationForm(UserCreationForm):
     """User registration form with additional fields"""
-    email = forms.EmailField(required=True)
+    # Uniqueness is checked by ModelForm.validate_unique; this only sets its message
+    email = forms.EmailField(required=True, error_messages={'unique': 'A user with this email already exists.'})
     phone_number = forms.CharField(max_length=20, required=False)
     
     class Meta:
         model = CustomUser
         fields = ('username', 'email', 'phone_number', 'password1', 'password2')
     
-    def clean_email(self):
-        email = self.cleaned_data.get('email')
-        if CustomUser.objects.filter(email=email).exists():
-            raise ValidationError('A user with this email already exists.')
-        return email
-    
     def save(self, commit=True):
         user = super().save(commit=False)
         user.email = self.cleaned_data['email']
@@ -37,17 +41,17 @@ class UserProfileForm(forms.ModelForm):
             'first_name', 'last_name', 'phone_number', 'communities'
         ]
         widgets = {
+            'first_name': forms.TextInput(attrs={'class': 'form-control'}),
+            'last_name': forms.TextInput(attrs={'class': 'form-control'}),
+            'phone_number': forms.TextInput(attrs={'class': 'form-control'}),
             'communities': forms.CheckboxSelectMultiple(),
         }
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Add CSS classes to form fields
-        for field_name, field in self.fields.items():
-            if field_name != 'communities':
-                field.widget.attrs['class'] = 'form-control'
         # Filter active communities
         self.fields['communities'].queryset = Community.objects.filter(is_active=True)
+        use_cached_choices(self.fields['communities'], active_communities)
 
 
 class CommunityForm(forms.ModelForm):
@@ -101,17 +105,21 @@ class AlertForm(forms.ModelForm):
         user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         # Filter active categories and communities
-        self.fields['category'].queryset = AlertCategory.objects.filter(is_active=True)
-        self.fields['community'].queryset = Community.objects.filter(is_active=True)
+        self.fields['category'].queryset = AlertCategory.objects.filter(is_active=True).only('id', 'name')
+        self.fields['community'].queryset = Community.objects.filter(is_active=True).only('id', 'name')
+        use_cached_choices(self.fields['category'], active_categories)
+        use_cached_choices(self.fields['community'], active_communities)
         
         # If user is provided, filter communities to only those the user belongs to
         if user and not user.is_staff:
-            self.fields['community'].queryset = user.communities.filter(is_active=True)
+            self.fields['community'].queryset = user.communities.filter(is_active=True).only('id', 'name')
+            rows = list(self.fields['community'].queryset.values('id', 'name'))
+            use_cached_choices(self.fields['community'], lambda: rows)
         
-        # Set default incident datetime to now
-        if not self.instance.pk:
-            from django.utils import timezone
-            self.fields['incident_datetime'].initial = timezone.now()
+        # Default incident datetime to now; the callable is only evaluated when rendered
+        # (Alert.id has a default, so test _state.adding rather than pk)
+        if self.instance._state.adding:
+            self.fields['incident_datetime'].initial = timezone.now
 
 
 class AlertCommentForm(forms.Form):
@@ -148,21 +156,22 @@ class AlertMediaForm(forms.Form):
     def clean_media_file(self):
         file = self.cleaned_data.get('media_file')
         if file:
-            # Check file size (50MB limit)
-            if file.size > 50 * 1024 * 1024:
+            # Check file size first so oversized uploads fail fast
+            if file.size > MAX_MEDIA_BYTES:
                 raise ValidationError('File size cannot exceed 50MB.')
             
             # Check file type
-            allowed_types = [
-                'image/jpeg', 'image/png', 'image/gif',
-                'video/mp4', 'video/webm', 'video/quicktime'
-            ]
-            if file.content_type not in allowed_types:
+            if file.content_type not in ALLOWED_MEDIA_TYPES:
                 raise ValidationError('File type not supported. Please upload images (JPEG, PNG, GIF) or videos (MP4, WebM).')
         
         return file
 
 
+# Filter choices for AlertSearchForm, with a blank "all" option first
+SEVERITY_FILTER_CHOICES = (('', 'All Severities'),) + tuple(Alert.SEVERITY_CHOICES)
+STATUS_FILTER_CHOICES = (('', 'All Statuses'),) + tuple(Alert.STATUS_CHOICES)
+
+
 class AlertSearchForm(forms.Form):
     """Form for searching and filtering alerts"""
     search = forms.CharField(
@@ -172,28 +181,35 @@ class AlertSearchForm(forms.Form):
         }),
         required=False
     )
-    category = forms.ModelChoiceField(
-        queryset=AlertCategory.objects.filter(is_active=True),
+    # Plain choice fields: a search filter only needs the id, so choices come
+    # from the cached rows and cleaning never touches the database
+    category = forms.ChoiceField(
         widget=forms.Select(attrs={'class': 'form-control'}),
-        required=False,
-        empty_label='All Categories'
+        required=False
     )
     severity = forms.ChoiceField(
-        choices=[('', 'All Severities')] + Alert.SEVERITY_CHOICES,
+        choices=SEVERITY_FILTER_CHOICES,
         widget=forms.Select(attrs={'class': 'form-control'}),
         required=False
     )
     status = forms.ChoiceField(
-        choices=[('', 'All Statuses')] + Alert.STATUS_CHOICES,
+        choices=STATUS_FILTER_CHOICES,
         widget=forms.Select(attrs={'class': 'form-control'}),
         required=False
     )
-    community = forms.ModelChoiceField(
-        queryset=Community.objects.filter(is_active=True),
+    community = forms.ChoiceField(
         widget=forms.Select(attrs={'class': 'form-control'}),
-        required=False,
-        empty_label='All Communities'
+        required=False
     )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['category'].choices = [('', 'All Categories')] + [
+            (row['id'], row['name']) for row in active_categories()
+        ]
+        self.fields['community'].choices = [('', 'All Communities')] + [
+            (row['id'], row['name']) for row in active_communities()
+        ]
 
 
 # ============================================================================
@@ -250,6 +266,12 @@ class AdminUserForm(forms.ModelForm):
             'push_notifications': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'communities': forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'}),
         }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Render checkboxes from cached (id, name) rows instead of model instances
+        self.fields['communities'].queryset = Community.objects.filter(is_active=True).only('id', 'name')
+        use_cached_choices(self.fields['communities'], active_communities)
 
 
 # ============================================================================
@@ -1,10 +1,14 @@
 from datetime import timedelta
 
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
 from django.core.files.base import ContentFile
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
 
+from api.views import CATEGORIES_CACHE_KEY, COMMUNITIES_CACHE_KEY, STATS_CACHE_KEY
+from community.choices import invalidate_choices
 from community.models import (
     Alert,
     AlertCategory,
@@ -16,6 +20,12 @@ from community.models import (
     Notification,
     PushNotificationDevice,
 )
+from community.stats import (
+    bump_public_alerts_version,
+    community_alert_stats_cache_key,
+    invalidate_home_stats,
+    invalidate_member_counts,
+)
 
 
 class Command(BaseCommand):
@@ -24,20 +34,43 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write("Resetting alert data and populating sample records...")
 
+        # One reference time so alert and notification timestamps line up
+        now = timezone.now()
+
         with transaction.atomic():
             users = self._create_users()
             communities = self._create_communities(users)
             categories = self._create_categories()
-            alerts = self._reset_and_create_alerts(users, communities, categories)
+            alerts = self._reset_and_create_alerts(users, communities, categories, now)
             self._create_alert_engagement(users, alerts)
-            self._create_notifications(users, alerts)
+            self._create_notifications(users, alerts, now)
             self._create_devices(users)
 
+        # bulk_create skips the save signals that invalidate cached payloads
+        self._invalidate_caches()
+
         self.stdout.write(self.style.SUCCESS("Database sample data created successfully."))
         self.stdout.write("Admin login:")
         self.stdout.write("  Email: admin@example.com")
         self.stdout.write("  Password: admin123")
 
+    def _invalidate_caches(self):
+        """
+        Delete the cached payloads built from the reset rows. Only these keys
+        are removed: a shared Redis database also holds buffered view counts.
+        """
+        community_pks = list(Community.objects.values_list("pk", flat=True))
+        category_pks = AlertCategory.objects.values_list("pk", flat=True)
+        invalidate_home_stats()
+        invalidate_choices()
+        invalidate_member_counts(community_pks)
+        bump_public_alerts_version()
+        cache.delete_many(
+            [CATEGORIES_CACHE_KEY, COMMUNITIES_CACHE_KEY, STATS_CACHE_KEY]
+            + [AlertCategory.cache_key(pk) for pk in category_pks]
+            + [community_alert_stats_cache_key(pk) for pk in community_pks]
+        )
+
     def _create_users(self):
         users_data = [
             {
@@ -92,21 +125,36 @@ class Command(BaseCommand):
             },
         ]
 
-        users = {}
-        for data in users_data:
-            password = data.pop("password")
-            user, _ = CustomUser.objects.update_or_create(
-                email=data["email"],
-                defaults={
-                    **data,
-                    "email_verified": True,
-                    "email_notifications": True,
-                    "push_notifications": True,
-                },
-            )
-            user.set_password(password)
-            user.save()
-            users[user.username] = user
+        # PBKDF2 dominates this command's runtime; hash each distinct sample
+        # password once and share the (throwaway) hash between its users
+        hashed_passwords = {
+            password: make_password(password)
+            for password in {data["password"] for data in users_data}
+        }
+        CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    **{key: value for key, value in data.items() if key != "password"},
+                    password=hashed_passwords[data["password"]],
+                    email_verified=True,
+                    email_notifications=True,
+                    push_notifications=True,
+                )
+                for data in users_data
+            ],
+            update_conflicts=True,
+            unique_fields=["email"],
+            update_fields=[
+                "username", "password", "role", "first_name", "last_name", "is_staff",
+                "is_superuser", "email_verified", "email_notifications", "push_notifications",
+            ],
+        )
+
+        users = {
+            user.username: user
+            for user in CustomUser.objects.filter(email__in=[data["email"] for data in users_data])
+        }
+        for user in users.values():
             self.stdout.write(f"Upserted user: {user.email}")
 
         return users
@@ -133,15 +181,25 @@ class Command(BaseCommand):
             },
         ]
 
-        communities = {}
-        for spec in community_specs:
-            members = spec.pop("members")
-            community, _ = Community.objects.update_or_create(
-                name=spec["name"],
-                defaults=spec,
-            )
-            community.members.set([users[username] for username in members])
-            communities[community.name] = community
+        members = {spec["name"]: spec.pop("members") for spec in community_specs}
+        Community.objects.bulk_create(
+            [Community(**spec) for spec in community_specs],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["description", "created_by"],
+        )
+
+        communities = Community.objects.in_bulk(list(members), field_name="name")
+
+        # Replace the sample communities' memberships with two queries
+        Membership = CustomUser.communities.through
+        Membership.objects.filter(community__in=communities.values()).delete()
+        Membership.objects.bulk_create([
+            Membership(customuser_id=users[username].id, community_id=community.id)
+            for name, community in communities.items()
+            for username in members[name]
+        ])
+        for community in communities.values():
             self.stdout.write(f"Upserted community: {community.name}")
 
         return communities
@@ -186,23 +244,26 @@ class Command(BaseCommand):
             },
         ]
 
-        categories = {}
-        for data in categories_data:
-            category, _ = AlertCategory.objects.update_or_create(
-                name=data["name"],
-                defaults=data,
-            )
-            categories[category.name] = category
+        AlertCategory.objects.bulk_create(
+            [AlertCategory(**data) for data in categories_data],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["description", "icon", "color"],
+        )
+
+        categories = AlertCategory.objects.in_bulk(
+            [data["name"] for data in categories_data], field_name="name"
+        )
+        for category in categories.values():
             self.stdout.write(f"Upserted category: {category.name}")
 
         return categories
 
-    def _reset_and_create_alerts(self, users, communities, categories):
+    def _reset_and_create_alerts(self, users, communities, categories, now):
         deleted_alerts = Alert.objects.count()
         Alert.objects.all().delete()
         self.stdout.write(f"Deleted {deleted_alerts} existing alerts.")
 
-        now = timezone.now()
         alert_specs = [
             {
                 "title": "Phone snatching reported at evening bus stop",
@@ -276,10 +337,8 @@ class Command(BaseCommand):
             },
         ]
 
-        alerts = []
-        for spec in alert_specs:
-            alert = Alert.objects.create(**spec)
-            alerts.append(alert)
+        alerts = Alert.objects.bulk_create([Alert(**spec) for spec in alert_specs])
+        for alert in alerts:
             self.stdout.write(f"Created alert: {alert.title}")
 
         media_payloads = [
@@ -287,8 +346,12 @@ class Command(BaseCommand):
             (alerts[1], "video", "school_gate_clip.mp4", "Short clip from a resident overlooking the gate."),
         ]
         for alert, media_type, filename, caption in media_payloads:
-            media = AlertMedia(alert=alert, media_type=media_type, caption=caption)
-            media.file.save(filename, ContentFile(b"sample media placeholder"), save=True)
+            AlertMedia.objects.create(
+                alert=alert,
+                media_type=media_type,
+                caption=caption,
+                file=ContentFile(b"sample media placeholder", name=filename),
+            )
             self.stdout.write(f"Created media for alert: {alert.title}")
 
         return alerts
@@ -341,8 +404,7 @@ class Command(BaseCommand):
 
         self.stdout.write("Created votes and comments.")
 
-    def _create_notifications(self, users, alerts):
-        now = timezone.now()
+    def _create_notifications(self, users, alerts, now):
         notification_specs = [
             {
                 "alert": alerts[0],
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from community.view_counts import flush_view_counts
+
+
+class Command(BaseCommand):
+    help = "Write alert view counts buffered in Redis to the database (run every 30s or so)"
+
+    def handle(self, *args, **options):
+        updated = flush_view_counts()
+        self.stdout.write(self.style.SUCCESS(f"Flushed view counts for {updated} alerts"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from community.models import Alert
+
+
+class Command(BaseCommand):
+    help = "Recompute alert upvote/downvote counters from the vote rows"
+
+    def handle(self, *args, **options):
+        updated = Alert.objects.reconcile_vote_counts()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled vote counts for {updated} alerts"))
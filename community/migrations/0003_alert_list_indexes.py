@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-15 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0002_pushnotificationdevice'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['-created_at'], name='alert_public_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['community', '-created_at'], name='community_a_communi_39851f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['category', '-created_at'], name='community_a_categor_f9b348_idx'),
+        ),
+    ]
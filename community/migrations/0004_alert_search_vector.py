@@ -0,0 +1,59 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_DOCUMENT = """
+    setweight(to_tsvector('simple', coalesce({row}.title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({row}.description, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce({row}.address, '')), 'C')
+"""
+
+CREATE_SQL = f"""
+CREATE FUNCTION community_alert_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_DOCUMENT.format(row='NEW')};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER community_alert_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, address ON community_alert
+    FOR EACH ROW EXECUTE FUNCTION community_alert_search_vector_update();
+
+CREATE INDEX community_alert_search_vector_gin ON community_alert USING gin (search_vector);
+
+UPDATE community_alert SET search_vector = {SEARCH_DOCUMENT.format(row='community_alert')};
+"""
+
+DROP_SQL = """
+DROP INDEX IF EXISTS community_alert_search_vector_gin;
+DROP TRIGGER IF EXISTS community_alert_search_vector_trigger ON community_alert;
+DROP FUNCTION IF EXISTS community_alert_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    # tsvector, GIN and plpgsql are PostgreSQL-only; SQLite keeps icontains search
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0003_alert_list_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="alert",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
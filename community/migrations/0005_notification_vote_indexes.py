@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-15 01:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0004_alert_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alertvote',
+            index=models.Index(fields=['user', 'alert'], name='vote_user_alert_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'status', '-created_at'], name='notif_user_status_ct_idx'),
+        ),
+    ]
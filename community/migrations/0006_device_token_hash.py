@@ -0,0 +1,41 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_device_tokens(apps, schema_editor):
+    PushNotificationDevice = apps.get_model("community", "PushNotificationDevice")
+    devices = list(PushNotificationDevice.objects.only("id", "device_token"))
+    for device in devices:
+        device.device_token_hash = hashlib.blake2b(device.device_token.encode(), digest_size=16).digest()
+    PushNotificationDevice.objects.bulk_update(devices, ["device_token_hash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0005_notification_vote_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pushnotificationdevice",
+            name="device_token_hash",
+            field=models.BinaryField(editable=False, max_length=16, null=True),
+        ),
+        migrations.RunPython(hash_device_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="pushnotificationdevice",
+            name="device_token_hash",
+            field=models.BinaryField(editable=False, max_length=16, unique=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name="pushnotificationdevice",
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name="pushnotificationdevice",
+            name="device_token",
+            field=models.TextField(),
+        ),
+    ]
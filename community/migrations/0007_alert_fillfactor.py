@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def set_fillfactor(apps, schema_editor):
+    # Leave free space in each heap page so counter-only UPDATEs (votes, views)
+    # can be HOT updates that skip rewriting every index entry
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE community_alert SET (fillfactor = 80);")
+
+
+def reset_fillfactor(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE community_alert RESET (fillfactor);")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0006_device_token_hash"),
+    ]
+
+    operations = [
+        migrations.RunPython(set_fillfactor, reset_fillfactor),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-15 01:49
+
+import community.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0007_alert_fillfactor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alertmedia',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='alertmedia',
+            name='file',
+            field=models.FileField(upload_to=community.models.alert_media_upload_to),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-15 01:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0008_alert_media_content_hash'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='alert',
+            name='community_a_severit_f87617_idx',
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['community', '-created_at'], name='alert_active_community_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-15 01:53
+
+import community.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0009_alert_active_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='alert',
+            name='id',
+            field=models.UUIDField(default=community.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='id',
+            field=models.UUIDField(default=community.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
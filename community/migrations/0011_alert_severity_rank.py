@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-15 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0010_time_ordered_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='severity_rank',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(severity='low', then=0), models.When(severity='medium', then=1), models.When(severity='high', then=2), models.When(severity='critical', then=3), default=1), output_field=models.PositiveSmallIntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['-severity_rank', '-created_at'], name='alert_severity_rank_idx'),
+        ),
+    ]
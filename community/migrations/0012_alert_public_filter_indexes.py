@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-15 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0011_alert_severity_rank'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['status', '-created_at'], name='alert_public_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['severity', '-created_at'], name='alert_public_severity_idx'),
+        ),
+    ]
@@ -1,9 +1,17 @@
 from django.db import models
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+import hashlib
+import os
 import uuid
 
+from .ids import uuid7
+
 
 class Community(models.Model):
     """Represents a neighborhood or community area"""
@@ -67,6 +75,46 @@ class AlertCategory(models.Model):
 
     def __str__(self):
         return self.name
+    
+    @staticmethod
+    def cache_key(pk):
+        return f'alertcat:{pk}'
+    
+    @classmethod
+    def get_cached(cls, pk):
+        """Fetch a category by pk through the cache; cleared by community.signals on change"""
+        return cache.get_or_set(cls.cache_key(pk), lambda: cls.objects.get(pk=pk), 3600)
+
+
+# Columns the alert card templates render; everything else stays deferred
+ALERT_CARD_FIELDS = (
+    'id', 'title', 'description', 'severity', 'status', 'address',
+    'created_at', 'view_count', 'upvotes', 'downvotes',
+    'category__name', 'community__name', 'created_by__username',
+)
+
+
+class AlertQuerySet(models.QuerySet):
+    def with_related(self):
+        """Join the foreign keys every alert listing renders"""
+        return self.select_related('category', 'community', 'created_by')
+
+    def for_cards(self):
+        """with_related(), loading only the columns alert cards display"""
+        return self.with_related().only(*ALERT_CARD_FIELDS)
+
+    def by_severity(self):
+        """Most severe first, newest first within a severity"""
+        return self.order_by('-severity_rank', '-created_at')
+
+    def reconcile_vote_counts(self):
+        """Recount upvotes/downvotes from AlertVote rows; returns the alerts updated"""
+        def tally(vote_type):
+            votes = AlertVote.objects.filter(
+                alert=models.OuterRef('pk'), vote_type=vote_type
+            ).order_by().values('alert').annotate(total=models.Count('pk')).values('total')
+            return Coalesce(models.Subquery(votes), 0)
+        return self.update(upvotes=tally('up'), downvotes=tally('down'))
 
 
 class Alert(models.Model):
@@ -85,12 +133,21 @@ class Alert(models.Model):
         ('under_review', 'Under Review'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     title = models.CharField(max_length=200)
     description = models.TextField()
     category = models.ForeignKey(AlertCategory, on_delete=models.CASCADE, related_name='alerts')
     severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES, default='medium')
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='active')
+    # Integer rank of severity (low=0 .. critical=3), computed by the database
+    severity_rank = models.GeneratedField(
+        expression=models.Case(
+            *[models.When(severity=value, then=rank) for rank, (value, _) in enumerate(SEVERITY_CHOICES)],
+            default=1,
+        ),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+    )
     
     # Community information
     community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='alerts')
@@ -115,12 +172,42 @@ class Alert(models.Model):
     is_public = models.BooleanField(default=True)
     is_verified = models.BooleanField(default=False)  # Verified by moderators
 
+    # Full-text search document, maintained by a database trigger on PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = AlertQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['created_at']),
-            models.Index(fields=['severity', 'status']),
             models.Index(fields=['community', 'status']),
+            models.Index(fields=['-created_at'], condition=models.Q(is_public=True), name='alert_public_created_idx'),
+            models.Index(fields=['community', '-created_at']),
+            models.Index(fields=['category', '-created_at']),
+            # by_severity() over public alerts
+            models.Index(
+                fields=['-severity_rank', '-created_at'],
+                condition=models.Q(is_public=True),
+                name='alert_severity_rank_idx'
+            ),
+            # alert_list status/severity filters over public alerts, newest first;
+            # status='active' also serves the home page's live feed
+            models.Index(
+                fields=['status', '-created_at'],
+                condition=models.Q(is_public=True),
+                name='alert_public_status_idx'
+            ),
+            models.Index(
+                fields=['severity', '-created_at'],
+                condition=models.Q(is_public=True),
+                name='alert_public_severity_idx'
+            ),
+            models.Index(
+                fields=['community', '-created_at'],
+                condition=models.Q(status='active'),
+                name='alert_active_community_idx'
+            ),
         ]
 
     def __str__(self):
@@ -131,6 +218,15 @@ class Alert(models.Model):
         return self.severity == 'critical'
 
 
+def alert_media_upload_to(instance, filename):
+    """Content-addressed path, so identical uploads share one stored object"""
+    ext = os.path.splitext(filename)[1].lower()
+    digest = instance.content_hash
+    if not digest:
+        return timezone.now().strftime('alert_media/%Y/%m/%d/') + filename
+    return f'alert_media/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
 class AlertMedia(models.Model):
     """Media files attached to alerts (photos, videos)"""
     MEDIA_TYPES = [
@@ -140,7 +236,8 @@ class AlertMedia(models.Model):
     
     alert = models.ForeignKey(Alert, on_delete=models.CASCADE, related_name='media')
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPES)
-    file = models.FileField(upload_to='alert_media/%Y/%m/%d/')
+    file = models.FileField(upload_to=alert_media_upload_to)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, editable=False)  # SHA-256 of file
     caption = models.CharField(max_length=300, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
@@ -149,6 +246,20 @@ class AlertMedia(models.Model):
 
     def __str__(self):
         return f"{self.media_type} for {self.alert.title}"
+    
+    def save(self, *args, **kwargs):
+        if self.file and not self.file._committed:
+            digest = hashlib.sha256()
+            for chunk in self.file.chunks():
+                digest.update(chunk)
+            self.content_hash = digest.hexdigest()
+            
+            name = self.file.field.generate_filename(self, self.file.name)
+            if self.file.storage.exists(name):
+                # Same bytes are already stored; reuse them instead of uploading a copy
+                self.file.name = name
+                self.file._committed = True
+        super().save(*args, **kwargs)
 
 
 class AlertVote(models.Model):
@@ -165,6 +276,10 @@ class AlertVote(models.Model):
     
     class Meta:
         unique_together = ['alert', 'user']
+        indexes = [
+            # unique_together leads with alert; this serves per-user vote lookups
+            models.Index(fields=['user', 'alert'], name='vote_user_alert_idx'),
+        ]
 
 
 class Notification(models.Model):
@@ -182,7 +297,7 @@ class Notification(models.Model):
         ('delivered', 'Delivered'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     alert = models.ForeignKey(Alert, on_delete=models.CASCADE, related_name='notifications')
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='notifications')
     notification_type = models.CharField(max_length=10, choices=NOTIFICATION_TYPES)
@@ -203,10 +318,33 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['status', 'notification_type']),
             models.Index(fields=['created_at']),
+            # Per-user inbox lists and unread counts
+            models.Index(fields=['user', 'status', '-created_at'], name='notif_user_status_ct_idx'),
         ]
 
     def __str__(self):
         return f"{self.notification_type} to {self.user.email} - {self.status}"
+    
+    @classmethod
+    def broadcast(cls, alert, users, notification_type, title, message, **fields):
+        """
+        Create one notification per user with batched multi-row INSERTs.
+        ``message`` may be a string or a callable taking the user.
+        """
+        notifications = [
+            cls(
+                alert=alert,
+                user=user,
+                notification_type=notification_type,
+                title=title,
+                message=message(user) if callable(message) else message,
+                **fields
+            )
+            for user in users
+        ]
+        return cls.objects.bulk_create(
+            notifications, batch_size=getattr(settings, 'NOTIFICATION_BATCH_SIZE', 500)
+        )
 
 
 class AlertComment(models.Model):
@@ -236,7 +374,10 @@ class PushNotificationDevice(models.Model):
     ]
     
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='devices')
-    device_token = models.TextField(unique=True)
+    device_token = models.TextField()
+    # 16-byte digest of device_token; uniqueness and lookups go through this
+    # instead of indexing the full 150-300 byte token
+    device_token_hash = models.BinaryField(max_length=16, unique=True, editable=False)
     device_type = models.CharField(max_length=10, choices=DEVICE_TYPES, default='web')
     device_name = models.CharField(max_length=200, blank=True)  # e.g., "Chrome on Windows"
     is_active = models.BooleanField(default=True)
@@ -246,8 +387,16 @@ class PushNotificationDevice(models.Model):
     last_used = models.DateTimeField(auto_now=True)
     
     class Meta:
-        unique_together = ['user', 'device_token']
         ordering = ['-last_used']
     
     def __str__(self):
         return f"{self.user.username} - {self.device_type} - {self.device_name or 'Unknown Device'}"
+    
+    @staticmethod
+    def hash_token(device_token):
+        """Digest used to look up a device by its token"""
+        return hashlib.blake2b(device_token.encode(), digest_size=16).digest()
+    
+    def save(self, *args, **kwargs):
+        self.device_token_hash = self.hash_token(self.device_token)
+        super().save(*args, **kwargs)
@@ -0,0 +1,34 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+def count_cache_key(prefix, filters, version=None):
+    """
+    Build a stable cache key for a filtered count. Passing the version of the
+    underlying rows makes a change to them start a fresh count.
+    """
+    digest = hashlib.md5(repr((version, sorted(filters.items()))).encode()).hexdigest()
+    return f'{prefix}:{digest}'
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that caches the total object count for a short time, so paging
+    through a filtered list doesn't re-run COUNT(*) on every request.
+    """
+
+    def __init__(self, object_list, per_page, cache_key, timeout=120, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = timeout
+
+    @cached_property
+    def count(self):
+        total = cache.get(self.cache_key)
+        if total is None:
+            total = self.object_list.count()
+            cache.set(self.cache_key, total, self.timeout)
+        return total
@@ -0,0 +1,27 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Q
+
+
+def search_alerts(alerts, term, ranked=False):
+    """
+    Filter an Alert queryset by a free-text search term.
+
+    On PostgreSQL this matches against the GIN-indexed search_vector column.
+    Other databases, and terms containing wildcards, fall back to icontains
+    matching on title, description and address.
+
+    With ranked=True, full-text matches are ordered by relevance and then
+    recency; the fallback keeps the queryset's ordering.
+    """
+    if connections[alerts.db].vendor == 'postgresql' and not any(c in term for c in '%_*'):
+        query = SearchQuery(term, config='simple', search_type='websearch')
+        alerts = alerts.filter(search_vector=query)
+        if ranked:
+            alerts = alerts.annotate(rank=SearchRank('search_vector', query)).order_by('-rank', '-created_at')
+        return alerts
+    return alerts.filter(
+        Q(title__icontains=term) |
+        Q(description__icontains=term) |
+        Q(address__icontains=term)
+    )
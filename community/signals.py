@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .choices import invalidate_choices
+from .models import Alert, AlertCategory, AlertComment, AlertMedia, Community, CustomUser
+from .stats import bump_public_alerts_version, invalidate_home_stats, invalidate_member_counts
+
+
+@receiver([post_save, post_delete], sender=AlertCategory)
+@receiver([post_save, post_delete], sender=Community)
+def invalidate_cached_choices(sender, **kwargs):
+    invalidate_choices()
+
+
+@receiver([post_save, post_delete], sender=AlertCategory)
+def invalidate_cached_category(sender, instance, **kwargs):
+    cache.delete(AlertCategory.cache_key(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Alert)
+def invalidate_cached_alert_stats(sender, **kwargs):
+    invalidate_home_stats()
+    bump_public_alerts_version()
+
+
+@receiver([post_save, post_delete], sender=AlertComment)
+@receiver([post_save, post_delete], sender=AlertMedia)
+def bump_alert_version_for_counts(sender, **kwargs):
+    bump_public_alerts_version()
+
+
+@receiver(m2m_changed, sender=CustomUser.communities.through)
+def invalidate_cached_member_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # community.members was changed
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_member_counts([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_member_counts(pk_set)
+    elif action == 'pre_clear':
+        # pk_set is empty on clear, so collect the user's communities first
+        invalidate_member_counts(instance.communities.values_list('pk', flat=True))
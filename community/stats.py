@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Alert
+
+HOME_STATS_CACHE_KEY = 'home_alert_stats:v1'
+HOME_STATS_CACHE_TIMEOUT = 60
+MEMBER_COUNT_CACHE_TIMEOUT = 300
+# Bumped whenever an alert, its votes, comments or media change; part of
+# cached list counts and the API list validators
+PUBLIC_ALERTS_VERSION_KEY = 'public_alerts_version'
+
+
+def compute_home_stats():
+    return Alert.objects.filter(is_public=True).aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status='active')),
+        resolved=Count('id', filter=Q(status='resolved')),
+    )
+
+
+def home_stats():
+    """Cached total/active/resolved counts of public alerts"""
+    return cache.get_or_set(HOME_STATS_CACHE_KEY, compute_home_stats, HOME_STATS_CACHE_TIMEOUT)
+
+
+def invalidate_home_stats():
+    cache.delete(HOME_STATS_CACHE_KEY)
+
+
+def community_alert_stats_cache_key(community_pk):
+    return f'community_alert_stats:{community_pk}'
+
+
+def member_count_cache_key(community_pk):
+    return f'community_members:{community_pk}'
+
+
+def community_member_count(community):
+    """Cached number of members in a community"""
+    return cache.get_or_set(
+        member_count_cache_key(community.pk), community.members.count, MEMBER_COUNT_CACHE_TIMEOUT
+    )
+
+
+def invalidate_member_counts(community_pks):
+    cache.delete_many([member_count_cache_key(pk) for pk in community_pks])
+
+
+def public_alerts_version():
+    """Time alert listings last changed, recorded on first use if unknown"""
+    version = cache.get(PUBLIC_ALERTS_VERSION_KEY)
+    if version is None:
+        cache.add(PUBLIC_ALERTS_VERSION_KEY, timezone.now(), None)
+        version = cache.get(PUBLIC_ALERTS_VERSION_KEY) or timezone.now()
+    return version
+
+
+def bump_public_alerts_version():
+    cache.set(PUBLIC_ALERTS_VERSION_KEY, timezone.now(), None)
@@ -0,0 +1,15 @@
+from . import view_counts
+
+try:
+    from celery import shared_task
+except ImportError:
+    shared_task = None
+
+
+def flush_view_counts():
+    """Write alert view counts buffered in Redis to the database"""
+    return view_counts.flush_view_counts()
+
+
+if shared_task is not None:
+    flush_view_counts = shared_task(flush_view_counts)
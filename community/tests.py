@@ -1,51 +1,62 @@
-from django.test import TestCase, Client
-from django.urls import reverse
+from unittest import mock
+
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.utils import timezone
-from decimal import Decimal
-from datetime import timedelta
 from .models import Community, AlertCategory, Alert, AlertVote, Notification, AlertComment
+from . import views
+from .forms import UserRegistrationForm
 
 User = get_user_model()
 
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+HOME_URL = reverse_lazy('home')
+ALERT_LIST_URL = reverse_lazy('alert_list')
+CREATE_ALERT_URL = reverse_lazy('create_alert')
+USER_PROFILE_URL = reverse_lazy('user_profile')
+REGISTER_URL = reverse_lazy('register')
+API_ALERTS_URL = reverse_lazy('api:alerts_list')
+
+XSS_CONTENT = "<script>alert('XSS')</script>"
 
+TEST_CATEGORY = {'name': "Test Category", 'icon': "fas fa-test", 'color': "#007bff"}
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
 class ModelTestCase(TestCase):
     """Test cases for models"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.community = Community.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class"""
+        cls.user = User(username="modeltestuser", email="model@example.com")
+        cls.user.set_unusable_password()
+        cls.user.save()
+        
+        cls.community = Community.objects.create(
             name="Test Community",
             description="A test community",
-            latitude=Decimal('40.7589'),
-            longitude=Decimal('-73.9851'),
-            radius_km=2.5
+            created_by=cls.user
         )
         
-        self.category = AlertCategory.objects.create(
-            name="Test Category",
+        cls.category = AlertCategory.objects.create(
             description="A test category",
-            icon="fas fa-test",
-            color="#007bff"
-        )
-        
-        self.user = User.objects.create_user(
-            username="testuser",
-            email="test@example.com",
-            password="testpass123"
+            **TEST_CATEGORY
         )
         
-        self.alert = Alert.objects.create(
+        cls.alert = Alert.objects.create(
             title="Test Alert",
             description="This is a test alert",
-            category=self.category,
+            category=cls.category,
             severity="medium",
             status="active",
-            latitude=Decimal('40.7590'),
-            longitude=Decimal('-73.9850'),
             address="123 Test Street",
-            community=self.community,
-            created_by=self.user,
+            community=cls.community,
+            created_by=cls.user,
             incident_datetime=timezone.now()
         )
     
@@ -65,13 +76,11 @@ class ModelTestCase(TestCase):
     
     def test_alert_is_critical(self):
         """Test alert critical property"""
-        critical_alert = Alert.objects.create(
+        critical_alert = Alert(
             title="Critical Alert",
             description="This is critical",
             category=self.category,
             severity="critical",
-            latitude=Decimal('40.7590'),
-            longitude=Decimal('-73.9850'),
             community=self.community,
             created_by=self.user,
             incident_datetime=timezone.now()
@@ -89,7 +98,7 @@ class ModelTestCase(TestCase):
         self.assertEqual(user.role, "moderator")
         self.assertEqual(str(user), "newuser@example.com")
         self.assertTrue(user.email_notifications)
-        self.assertEqual(user.notification_radius_km, 5.0)
+        self.assertTrue(user.push_notifications)
     
     def test_alert_vote_creation(self):
         """Test alert voting system"""
@@ -103,117 +112,187 @@ class ModelTestCase(TestCase):
         self.assertEqual(vote.user, self.user)
 
 
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
 class ViewTestCase(TestCase):
     """Test cases for views"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.client = Client()
-        self.community = Community.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class"""
+        cls.user = User(username="viewtestuser", email="view@example.com")
+        cls.user.set_unusable_password()
+        cls.user.save()
+        
+        cls.community = Community.objects.create(
             name="Test Community",
-            latitude=Decimal('40.7589'),
-            longitude=Decimal('-73.9851'),
-            radius_km=2.5
+            created_by=cls.user
         )
         
-        self.category = AlertCategory.objects.create(
-            name="Test Category",
-            icon="fas fa-test",
-            color="#007bff"
-        )
+        cls.category, cls.other_category = AlertCategory.objects.bulk_create([
+            AlertCategory(**TEST_CATEGORY),
+            AlertCategory(name="Other Category", icon="fas fa-other", color="#ff0000"),
+        ])
         
-        self.user = User.objects.create_user(
-            username="testuser",
-            email="test@example.com",
-            password="testpass123"
-        )
+        now = timezone.now()
+        cls.alert, cls.other_alert = Alert.objects.bulk_create([
+            Alert(
+                title="Test Alert",
+                description="This is a test alert",
+                category=cls.category,
+                severity="medium",
+                community=cls.community,
+                created_by=cls.user,
+                incident_datetime=now
+            ),
+            Alert(
+                title="Other Alert",
+                description="Different alert",
+                category=cls.other_category,
+                severity="high",
+                community=cls.community,
+                created_by=cls.user,
+                incident_datetime=now
+            ),
+        ])
+        cls.user.communities.add(cls.community)
         
-        self.alert = Alert.objects.create(
-            title="Test Alert",
-            description="This is a test alert",
-            category=self.category,
-            severity="medium",
-            latitude=Decimal('40.7590'),
-            longitude=Decimal('-73.9850'),
-            community=self.community,
-            created_by=self.user,
-            incident_datetime=timezone.now()
-        )
+        cls.alert_detail_url = reverse('alert_detail', args=[cls.alert.id])
+        cls.edit_alert_url = reverse('edit_alert', args=[cls.alert.id])
+        cls.vote_alert_url = reverse('vote_alert', args=[cls.alert.id])
+    
+    def setUp(self):
+        self.client = Client()
+        self.factory = RequestFactory()
+        # Cached counts and choices would otherwise make query counts order-dependent
+        cache.clear()
+    
+    def anonymous_get(self, url):
+        """Build a GET request for an anonymous visitor without running middleware"""
+        request = self.factory.get(url)
+        request.user = AnonymousUser()
+        return request
     
     def test_home_view(self):
         """Test home page view"""
-        response = self.client.get(reverse('home'))
+        with self.assertNumQueries(2):
+            response = views.home(self.anonymous_get(HOME_URL))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Community Alert System")
         self.assertContains(response, self.alert.title)
     
     def test_alert_list_view(self):
         """Test alert list view"""
-        response = self.client.get(reverse('alert_list'))
+        with self.assertNumQueries(4):
+            response = views.alert_list(self.anonymous_get(ALERT_LIST_URL))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, self.alert.title)
     
     def test_alert_detail_view(self):
         """Test alert detail view"""
-        response = self.client.get(reverse('alert_detail', args=[self.alert.id]))
+        with self.assertNumQueries(5):
+            response = views.alert_detail(self.anonymous_get(self.alert_detail_url), self.alert.id)
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, self.alert.title)
         self.assertContains(response, self.alert.description)
     
     def test_alert_detail_increments_view_count(self):
         """Test that viewing alert increments view count"""
-        initial_count = self.alert.view_count
-        self.client.get(reverse('alert_detail', args=[self.alert.id]))
+        view_count = Alert.objects.filter(pk=self.alert.pk).values_list('view_count', flat=True)
+        initial_count = view_count.get()
+        views.alert_detail(self.anonymous_get(self.alert_detail_url), self.alert.id)
         
-        # Refresh from database
-        self.alert.refresh_from_db()
-        self.assertEqual(self.alert.view_count, initial_count + 1)
+        self.assertEqual(view_count.get(), initial_count + 1)
     
     def test_login_required_views(self):
         """Test that login-required views redirect when not authenticated"""
         # Test create alert view
-        response = self.client.get(reverse('create_alert'))
+        response = self.client.get(CREATE_ALERT_URL)
         self.assertRedirects(response, '/login/?next=/alerts/create/')
         
         # Test edit alert view
-        response = self.client.get(reverse('edit_alert', args=[self.alert.id]))
+        response = self.client.get(self.edit_alert_url)
         self.assertRedirects(response, f'/login/?next=/alerts/{self.alert.id}/edit/')
         
         # Test user profile view
-        response = self.client.get(reverse('user_profile'))
+        response = self.client.get(USER_PROFILE_URL)
         self.assertRedirects(response, '/login/?next=/profile/')
     
     def test_authenticated_user_can_create_alert(self):
         """Test that authenticated users can access create alert page"""
-        self.client.login(username='testuser', password='testpass123')
-        response = self.client.get(reverse('create_alert'))
+        self.client.force_login(self.user)
+        response = self.client.get(CREATE_ALERT_URL)
         self.assertEqual(response.status_code, 200)
+        # incident_datetime defaults to now on new alerts
+        self.assertIsNotNone(response.context['form']['incident_datetime'].value())
     
     def test_vote_alert_requires_login(self):
         """Test that voting requires authentication"""
         response = self.client.post(
-            reverse('vote_alert', args=[self.alert.id]),
+            self.vote_alert_url,
             {'vote_type': 'up'}
         )
         self.assertEqual(response.status_code, 302)  # Redirect to login
     
     def test_authenticated_user_can_vote(self):
         """Test that authenticated users can vote on alerts"""
-        self.client.login(username='testuser', password='testpass123')
-        response = self.client.post(
-            reverse('vote_alert', args=[self.alert.id]),
-            {'vote_type': 'up'},
-            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
-        )
+        self.client.force_login(self.user)
+        with self.assertNumQueries(13):
+            response = self.client.post(
+                self.vote_alert_url,
+                {'vote_type': 'up'},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
         self.assertEqual(response.status_code, 200)
         
         # Check that vote was created
-        vote = AlertVote.objects.get(alert=self.alert, user=self.user)
-        self.assertEqual(vote.vote_type, 'up')
+        vote_type = AlertVote.objects.filter(
+            alert=self.alert, user=self.user
+        ).values_list('vote_type', flat=True).first()
+        self.assertEqual(vote_type, 'up')
+    
+    def test_unvote_with_drifted_counter(self):
+        """Test that removing a vote never drives a drifted counter below zero"""
+        AlertVote.objects.create(alert=self.alert, user=self.user, vote_type='up')
+        self.client.force_login(self.user)
+        response = self.client.post(self.vote_alert_url, {'vote_type': 'up'})
+        self.assertEqual(response.json()['upvotes'], 0)
+        
+        AlertVote.objects.create(alert=self.alert, user=self.user, vote_type='down')
+        Alert.objects.reconcile_vote_counts()
+        counts = Alert.objects.values_list('upvotes', 'downvotes').get(pk=self.alert.pk)
+        self.assertEqual(counts, (0, 1))
+    
+    def test_alert_counts_refresh_after_create(self):
+        """Test that cached list totals include a newly created alert"""
+        self.assertEqual(self.client.get(API_ALERTS_URL).json()['pagination']['total'], 2)
+        self.assertEqual(self.client.get(ALERT_LIST_URL).context['page_obj'].paginator.count, 2)
+        
+        Alert.objects.create(
+            title="New Alert",
+            description="Created after the counts were cached",
+            category=self.category,
+            community=self.community,
+            created_by=self.user,
+            incident_datetime=timezone.now()
+        )
+        self.assertEqual(self.client.get(API_ALERTS_URL).json()['pagination']['total'], 3)
+        self.assertEqual(self.client.get(ALERT_LIST_URL).context['page_obj'].paginator.count, 3)
+    
+    def test_vote_changes_api_alerts_etag(self):
+        """Test that a vote invalidates cached API alert lists"""
+        etag = self.client.get(API_ALERTS_URL)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(API_ALERTS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        
+        self.client.force_login(self.user)
+        self.client.post(self.vote_alert_url, {'vote_type': 'up'})
+        response = self.client.get(API_ALERTS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
     
     def test_user_registration(self):
         """Test user registration"""
-        response = self.client.post(reverse('register'), {
+        response = self.client.post(REGISTER_URL, {
             'username': 'newuser',
             'email': 'newuser@example.com',
             'password1': 'complexpassword123',
@@ -222,126 +301,119 @@ class ViewTestCase(TestCase):
         self.assertEqual(response.status_code, 302)  # Redirect after successful registration
         
         # Check user was created
-        user = User.objects.get(username='newuser')
-        self.assertEqual(user.email, 'newuser@example.com')
+        email = User.objects.filter(username='newuser').values_list('email', flat=True).first()
+        self.assertEqual(email, 'newuser@example.com')
+    
+    def test_registration_race_reports_duplicate_email(self):
+        """Test that losing a signup race re-renders the form instead of erroring"""
+        # Skip the uniqueness check so the INSERT hits the database constraint
+        with mock.patch.object(UserRegistrationForm, 'validate_unique'):
+            response = self.client.post(REGISTER_URL, {
+                'username': 'racinguser',
+                'email': self.user.email,
+                'password1': 'complexpassword123',
+                'password2': 'complexpassword123'
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context['form'], 'email', 'A user with this email already exists.')
+        self.assertFalse(User.objects.filter(username='racinguser').exists())
     
     def test_alert_filtering(self):
         """Test alert filtering functionality"""
-        # Create another alert with different category
-        other_category = AlertCategory.objects.create(
-            name="Other Category",
-            icon="fas fa-other",
-            color="#ff0000"
-        )
-        
-        Alert.objects.create(
-            title="Other Alert",
-            description="Different alert",
-            category=other_category,
-            severity="high",
-            latitude=Decimal('40.7590'),
-            longitude=Decimal('-73.9850'),
-            community=self.community,
-            created_by=self.user,
-            incident_datetime=timezone.now()
-        )
-        
         # Test category filtering
-        response = self.client.get(reverse('alert_list'), {'category': self.category.id})
+        response = self.client.get(ALERT_LIST_URL, {'category': self.category.id})
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Test Alert")
         self.assertNotContains(response, "Other Alert")
         
         # Test severity filtering
-        response = self.client.get(reverse('alert_list'), {'severity': 'high'})
+        response = self.client.get(ALERT_LIST_URL, {'severity': 'high'})
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Other Alert")
         self.assertNotContains(response, "Test Alert")
+        
+        # Test severity sorting
+        response = self.client.get(API_ALERTS_URL, {'sort': 'severity'})
+        self.assertEqual(
+            [alert['id'] for alert in response.json()['data']], [str(self.other_alert.pk), str(self.alert.pk)]
+        )
 
 
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
 class SecurityTestCase(TestCase):
     """Test cases for security measures"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.client = Client()
-        self.community = Community.objects.create(
-            name="Test Community",
-            latitude=Decimal('40.7589'),
-            longitude=Decimal('-73.9851'),
-            radius_km=2.5
-        )
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by every test in the class"""
+        cls.user = User(username="sectestuser", email="sec@example.com")
+        cls.user.set_unusable_password()
+        cls.user.save()
         
-        self.category = AlertCategory.objects.create(
-            name="Test Category",
-            icon="fas fa-test",
-            color="#007bff"
-        )
+        cls.other_user = User(username="secotheruser", email="secother@example.com")
+        cls.other_user.set_unusable_password()
+        cls.other_user.save()
         
-        self.user = User.objects.create_user(
-            username="testuser",
-            email="test@example.com",
-            password="testpass123"
+        cls.community = Community.objects.create(
+            name="Test Community",
+            created_by=cls.user
         )
         
-        self.other_user = User.objects.create_user(
-            username="otheruser",
-            email="other@example.com",
-            password="testpass123"
-        )
+        cls.category = AlertCategory.objects.create(**TEST_CATEGORY)
         
-        self.alert = Alert.objects.create(
-            title="Test Alert",
-            description="This is a test alert",
-            category=self.category,
-            severity="medium",
-            latitude=Decimal('40.7590'),
-            longitude=Decimal('-73.9850'),
-            community=self.community,
-            created_by=self.user,
-            incident_datetime=timezone.now()
-        )
+        now = timezone.now()
+        cls.alert, cls.xss_alert = Alert.objects.bulk_create([
+            Alert(
+                title="Test Alert",
+                description="This is a test alert",
+                category=cls.category,
+                severity="medium",
+                community=cls.community,
+                created_by=cls.user,
+                incident_datetime=now
+            ),
+            # Alert with potentially malicious content
+            Alert(
+                title=f"Alert {XSS_CONTENT}",
+                description=f"Description {XSS_CONTENT}",
+                category=cls.category,
+                severity="medium",
+                community=cls.community,
+                created_by=cls.user,
+                incident_datetime=now
+            ),
+        ])
+        cls.edit_alert_url = reverse('edit_alert', args=[cls.alert.id])
+        cls.xss_alert_url = reverse('alert_detail', args=[cls.xss_alert.id])
+    
+    def setUp(self):
+        self.client = Client()
     
     def test_user_can_only_edit_own_alerts(self):
         """Test that users can only edit their own alerts"""
-        # Login as other user
-        self.client.login(username='otheruser', password='testpass123')
+        # Log in as other user
+        self.client.force_login(self.other_user)
         
         # Try to edit alert created by different user
-        response = self.client.get(reverse('edit_alert', args=[self.alert.id]))
+        response = self.client.get(self.edit_alert_url)
         self.assertEqual(response.status_code, 302)  # Should redirect
     
     def test_sql_injection_protection(self):
         """Test protection against SQL injection"""
         # Try SQL injection in search parameter
         malicious_search = "'; DROP TABLE community_alert; --"
-        response = self.client.get(reverse('alert_list'), {'search': malicious_search})
+        response = self.client.get(ALERT_LIST_URL, {'search': malicious_search})
         
         # Should return normal response, not cause error
         self.assertEqual(response.status_code, 200)
         
         # Alert should still exist (table not dropped)
-        self.assertTrue(Alert.objects.filter(id=self.alert.id).exists())
+        self.assertTrue(Alert.objects.filter(pk=self.alert.pk).only('pk').exists())
     
     def test_xss_protection(self):
         """Test protection against XSS attacks"""
-        # Create alert with potentially malicious content
-        xss_content = "<script>alert('XSS')</script>"
-        
-        alert = Alert.objects.create(
-            title=f"Alert {xss_content}",
-            description=f"Description {xss_content}",
-            category=self.category,
-            severity="medium",
-            latitude=Decimal('40.7590'),
-            longitude=Decimal('-73.9850'),
-            community=self.community,
-            created_by=self.user,
-            incident_datetime=timezone.now()
-        )
-        
-        response = self.client.get(reverse('alert_detail', args=[alert.id]))
+        response = self.client.get(self.xss_alert_url)
         
         # Script tags should be escaped in HTML
-        self.assertNotContains(response, "<script>")
+        self.assertNotContains(response, XSS_CONTENT)
         self.assertContains(response, "&lt;script&gt;")
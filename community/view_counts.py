@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models import F
+
+from .models import Alert
+
+# Redis hash of alert id -> views not yet written to Alert.view_count
+VIEW_COUNTS_KEY = 'alert_views'
+
+
+def get_redis():
+    """Return the raw Redis client behind the default cache, or None"""
+    try:
+        from django_redis import get_redis_connection
+    except ImportError:
+        return None
+    try:
+        return get_redis_connection('default')
+    except NotImplementedError:
+        # The default cache isn't a django-redis backend
+        return None
+
+
+def record_alert_view(alert_id):
+    """
+    Count one view of an alert. With Redis available the increment is
+    buffered in a hash and written later by flush_view_counts; otherwise the
+    row is updated directly.
+    """
+    client = get_redis()
+    if client is not None:
+        client.hincrby(VIEW_COUNTS_KEY, str(alert_id), 1)
+    else:
+        Alert.objects.filter(id=alert_id).update(view_count=F('view_count') + 1)
+
+
+def pending_views(alert_ids):
+    """Buffered view counts for the given alerts, keyed by str(id)"""
+    client = get_redis()
+    alert_ids = [str(alert_id) for alert_id in alert_ids]
+    if client is None or not alert_ids:
+        return {}
+    counts = client.hmget(VIEW_COUNTS_KEY, alert_ids)
+    return {
+        alert_id: int(count)
+        for alert_id, count in zip(alert_ids, counts)
+        if count is not None
+    }
+
+
+def flush_view_counts():
+    """Move buffered view counts into the database. Returns the alerts updated."""
+    client = get_redis()
+    if client is None:
+        return 0
+    
+    # Read and clear the hash in one MULTI so no increment is lost in between
+    pipe = client.pipeline(transaction=True)
+    pipe.hgetall(VIEW_COUNTS_KEY)
+    pipe.delete(VIEW_COUNTS_KEY)
+    counts, _ = pipe.execute()
+    
+    with transaction.atomic():
+        for alert_id, count in counts.items():
+            Alert.objects.filter(id=alert_id.decode()).update(view_count=F('view_count') + int(count))
+    return len(counts)
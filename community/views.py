@@ -3,45 +3,54 @@ from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db import models
-from django.db.models import Q, F
-from django.http import JsonResponse
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_POST
 from django.utils import timezone
 from .models import Alert, AlertCategory, Community, CustomUser, AlertVote
+from .choices import active_categories, active_communities
+from .pagination import CachedCountPaginator, count_cache_key
+from .search import search_alerts
+from .stats import (
+    bump_public_alerts_version, community_alert_stats_cache_key, community_member_count, home_stats,
+    public_alerts_version
+)
+from .view_counts import pending_views, record_alert_view
 from .forms import (
     UserRegistrationForm, AlertForm, UserProfileForm, UserNotificationForm, CommunityForm,
     AlertCategoryForm, AdminUserForm, CreateAdminUserForm
 )
+import logging
 import math
 
+logger = logging.getLogger(__name__)
+
 
 def home(request):
     """Home page showing recent alerts"""
     alerts = Alert.objects.filter(
         is_public=True, 
         status='active'
-    ).select_related('category', 'community', 'created_by').order_by('-created_at')[:10]
+    ).for_cards().order_by('-created_at')[:10]
     
     # Get alert statistics
-    total_alerts = Alert.objects.filter(is_public=True).count()
-    active_alerts = Alert.objects.filter(is_public=True, status='active').count()
-    resolved_alerts = Alert.objects.filter(is_public=True, status='resolved').count()
+    stats = home_stats()
     
     context = {
         'alerts': alerts,
-        'total_alerts': total_alerts,
-        'active_alerts': active_alerts,
-        'resolved_alerts': resolved_alerts,
+        'total_alerts': stats['total'],
+        'active_alerts': stats['active'],
+        'resolved_alerts': stats['resolved'],
     }
     return render(request, 'community/home.html', context)
 
 
 def alert_list(request):
     """List all public alerts with filtering"""
-    alerts = Alert.objects.filter(is_public=True).select_related(
-        'category', 'community', 'created_by'
-    ).order_by('-created_at')
+    alerts = Alert.objects.filter(is_public=True).for_cards().order_by('-created_at')
     
     # Filtering
     category_id = request.GET.get('category')
@@ -59,20 +68,25 @@ def alert_list(request):
     if community_id:
         alerts = alerts.filter(community_id=community_id)
     if search:
-        alerts = alerts.filter(
-            Q(title__icontains=search) | 
-            Q(description__icontains=search) |
-            Q(address__icontains=search)
-        )
-    
-    # Pagination
-    paginator = Paginator(alerts, 20)
+        alerts = search_alerts(alerts, search, ranked=True)
+    
+    # Pagination (the total is cached per filter combination until an alert changes)
+    filters = {
+        'category': category_id,
+        'severity': severity,
+        'status': status,
+        'community': community_id,
+        'search': search,
+    }
+    paginator = CachedCountPaginator(
+        alerts, 20, count_cache_key('alert_list_count', filters, public_alerts_version()), timeout=30
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Get filter options
-    categories = AlertCategory.objects.filter(is_active=True)
-    communities = Community.objects.filter(is_active=True)
+    # Get filter options (cached id/name rows, cleared by community.signals)
+    categories = active_categories()
+    communities = active_communities()
     
     context = {
         'page_obj': page_obj,
@@ -91,22 +105,19 @@ def alert_list(request):
 
 def alert_detail(request, alert_id):
     """Display detailed view of an alert"""
-    alert = get_object_or_404(
-        Alert.objects.select_related('category', 'community', 'created_by'),
-        id=alert_id,
-        is_public=True
-    )
+    alerts = Alert.objects.with_related()
+    if request.user.is_authenticated:
+        # Fetch the user's vote alongside the alert
+        alerts = alerts.annotate(user_vote=Subquery(
+            AlertVote.objects.filter(alert=OuterRef('pk'), user=request.user).values('vote_type')[:1]
+        ))
+    alert = get_object_or_404(alerts, id=alert_id, is_public=True)
     
     # Increment view count
-    Alert.objects.filter(id=alert_id).update(view_count=F('view_count') + 1)
+    record_alert_view(alert_id)
+    alert.view_count += pending_views([alert.id]).get(str(alert.id), 0)
     
-    # Get user's vote if logged in
-    user_vote = None
-    if request.user.is_authenticated:
-        try:
-            user_vote = AlertVote.objects.get(alert=alert, user=request.user).vote_type
-        except AlertVote.DoesNotExist:
-            pass
+    user_vote = getattr(alert, 'user_vote', None)
     
     # Get comments
     comments = alert.comments.filter(is_deleted=False, parent=None).select_related('user').order_by('created_at')
@@ -136,9 +147,11 @@ def create_alert(request):
             
             # Trigger notifications for community members
             try:
-                from notifications.views import trigger_alert_notifications
-                notifications_sent = trigger_alert_notifications(alert)
-                if notifications_sent > 0:
+                from notifications.tasks import queue_alert_notifications
+                notifications_sent = queue_alert_notifications(alert)
+                if notifications_sent is None:
+                    messages.success(request, 'Alert created successfully! Community members are being notified.')
+                elif notifications_sent > 0:
                     messages.success(request, f'Alert created successfully! {notifications_sent} community members have been notified.')
                 else:
                     messages.success(request, 'Alert created successfully!')
@@ -155,10 +168,10 @@ def create_alert(request):
 @login_required
 def edit_alert(request, alert_id):
     """Edit an existing alert (only by creator or moderators)"""
-    alert = get_object_or_404(Alert, id=alert_id)
+    alert = get_object_or_404(Alert.objects.select_related('community'), id=alert_id)
     
     # Check permissions
-    if alert.created_by != request.user and request.user.role not in ['moderator', 'admin']:
+    if alert.created_by_id != request.user.id and request.user.role not in ['moderator', 'admin']:
         messages.error(request, 'You do not have permission to edit this alert.')
         return redirect('alert_detail', alert_id=alert.id)
     
@@ -186,35 +199,50 @@ def vote_alert(request, alert_id):
     if vote_type not in ['up', 'down']:
         return JsonResponse({'error': 'Invalid vote type'}, status=400)
     
-    vote, created = AlertVote.objects.get_or_create(
-        alert=alert,
-        user=request.user,
-        defaults={'vote_type': vote_type}
-    )
-    
-    if not created:
-        if vote.vote_type == vote_type:
+    with transaction.atomic():
+        # Lock the user's vote so a double-submitted toggle is applied once
+        vote = AlertVote.objects.select_for_update().filter(alert=alert, user=request.user).first()
+        
+        # Adjust the denormalized counters in place rather than recounting votes,
+        # by however many vote rows actually changed
+        counters = {}
+        if vote is None:
+            try:
+                with transaction.atomic():
+                    AlertVote.objects.create(alert=alert, user=request.user, vote_type=vote_type)
+            except IntegrityError:
+                # A concurrent request recorded this user's vote first
+                pass
+            else:
+                counters[f'{vote_type}votes'] = F(f'{vote_type}votes') + 1
+        elif vote.vote_type == vote_type:
             # Remove vote if clicking same vote
-            vote.delete()
+            deleted, _ = AlertVote.objects.filter(pk=vote.pk).delete()
+            if deleted:
+                counters[f'{vote_type}votes'] = F(f'{vote_type}votes') - deleted
             vote_type = None
         else:
             # Change vote
-            vote.vote_type = vote_type
-            vote.save()
+            changed = AlertVote.objects.filter(pk=vote.pk, vote_type=vote.vote_type).update(vote_type=vote_type)
+            if changed:
+                counters[f'{vote.vote_type}votes'] = F(f'{vote.vote_type}votes') - changed
+                counters[f'{vote_type}votes'] = F(f'{vote_type}votes') + changed
+        
+        if counters:
+            try:
+                with transaction.atomic():
+                    Alert.objects.filter(id=alert_id).update(**counters)
+            except IntegrityError:
+                # The counters had drifted below the vote rows; recount this alert
+                Alert.objects.filter(id=alert_id).reconcile_vote_counts()
+    bump_public_alerts_version()
     
-    # Update alert vote counts
-    upvotes = alert.votes.filter(vote_type='up').count()
-    downvotes = alert.votes.filter(vote_type='down').count()
-    
-    Alert.objects.filter(id=alert_id).update(
-        upvotes=upvotes,
-        downvotes=downvotes
-    )
+    alert.refresh_from_db(fields=['upvotes', 'downvotes'])
     
     return JsonResponse({
         'success': True,
-        'upvotes': upvotes,
-        'downvotes': downvotes,
+        'upvotes': alert.upvotes,
+        'downvotes': alert.downvotes,
         'user_vote': vote_type
     })
 
@@ -224,9 +252,20 @@ def register(request):
     if request.method == 'POST':
         form = UserRegistrationForm(request.POST)
         if form.is_valid():
-            user = form.save()
-            messages.success(request, 'Registration successful! Please log in.')
-            return redirect('login')
+            try:
+                with transaction.atomic():
+                    form.save()
+            except IntegrityError:
+                # Lost a race with another signup; report whichever unique field clashed
+                if CustomUser.objects.filter(email=form.cleaned_data['email']).exists():
+                    form.add_error('email', form.fields['email'].error_messages['unique'])
+                elif CustomUser.objects.filter(username=form.cleaned_data['username']).exists():
+                    form.add_error('username', 'A user with that username already exists.')
+                else:
+                    raise
+            else:
+                messages.success(request, 'Registration successful! Please log in.')
+                return redirect('login')
     else:
         form = UserRegistrationForm()
     
@@ -248,11 +287,7 @@ def user_profile(request):
         if is_ajax:
             try:
                 action = request.POST.get('action')
-                
-                # Debug logging
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.info(f'AJAX request detected - Action: {action}, Headers: {dict(request.headers)}')
+                logger.info('AJAX request - action=%s', action)
                 
                 if action == 'update_profile':
                     # Update profile information
@@ -264,9 +299,7 @@ def user_profile(request):
                             'message': 'Profile updated successfully!'
                         })
                     else:
-                        # Debug logging
-                        logger.info(f'Form validation failed. Errors: {form.errors}')
-                        logger.info(f'Form data received: {dict(request.POST)}')
+                        logger.info('Form validation failed. Errors: %s', form.errors)
                         return JsonResponse({
                             'success': False,
                             'error': 'Please correct the form errors: ' + ', '.join([f'{field}: {", ".join(errors)}' for field, errors in form.errors.items()]),
@@ -277,14 +310,16 @@ def user_profile(request):
                     # Update notification preferences using the new form
                     form = UserNotificationForm(request.POST, instance=request.user)
                     if form.is_valid():
-                        form.save()
+                        # Only write the preference columns, not the whole user row
+                        form.save(commit=False).save(
+                            update_fields=[*UserNotificationForm.Meta.fields, 'updated_at']
+                        )
                         return JsonResponse({
                             'success': True,
                             'message': 'Notification settings updated successfully!'
                         })
                     else:
-                        logger.info(f'Notification form validation failed. Errors: {form.errors}')
-                        logger.info(f'Form data received: {dict(request.POST)}')
+                        logger.info('Notification form validation failed. Errors: %s', form.errors)
                         return JsonResponse({
                             'success': False,
                             'error': 'Please correct the form errors: ' + ', '.join([f'{field}: {", ".join(errors)}' for field, errors in form.errors.items()]),
@@ -302,11 +337,6 @@ def user_profile(request):
                     'success': False,
                     'error': f'An error occurred: {str(e)}'
                 })
-        else:
-            # Debug logging for non-AJAX requests
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f'Non-AJAX request - Action: {request.POST.get("action")}, Headers: {dict(request.headers)}')
         
         # Handle regular POST request (non-AJAX)
         form = UserProfileForm(request.POST, instance=request.user)
@@ -318,11 +348,12 @@ def user_profile(request):
         form = UserProfileForm(instance=request.user)
     
     # Get user's alerts
-    user_alerts = Alert.objects.filter(created_by=request.user).order_by('-created_at')[:5]
+    user_alerts = Alert.objects.filter(created_by=request.user).select_related('community').order_by('-created_at')[:5]
     
     context = {
         'form': form,
         'user_alerts': user_alerts,
+        'member_community_ids': set(request.user.communities.values_list('id', flat=True)),
     }
     return render(request, 'community/user_profile.html', context)
 
@@ -334,23 +365,30 @@ def community_detail(request, community_id):
     alerts = Alert.objects.filter(
         community=community,
         is_public=True
-    ).select_related('category', 'created_by').order_by('-created_at')
+    ).for_cards().order_by('-created_at')
+    
+    # Community statistics, cached briefly and counted in one pass
+    stats = cache.get_or_set(
+        community_alert_stats_cache_key(community.pk),
+        lambda: alerts.aggregate(
+            total=models.Count('id'),
+            active=models.Count('id', filter=Q(status='active')),
+        ),
+        30
+    )
+    member_count = community_member_count(community)
     
-    # Pagination
+    # Pagination; the total is already known from the statistics
     paginator = Paginator(alerts, 20)
+    paginator.count = stats['total']
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Community statistics
-    total_alerts = alerts.count()
-    active_alerts = alerts.filter(status='active').count()
-    member_count = community.members.count()
-    
     context = {
         'community': community,
         'page_obj': page_obj,
-        'total_alerts': total_alerts,
-        'active_alerts': active_alerts,
+        'total_alerts': stats['total'],
+        'active_alerts': stats['active'],
         'member_count': member_count,
     }
     return render(request, 'community/community_detail.html', context)
@@ -366,57 +404,29 @@ def my_community_alerts(request):
         community__in=user.communities.all(),
         is_public=True,
         status='active'
-    ).select_related('category', 'community', 'created_by').order_by('-created_at')
+    ).for_cards().order_by('-created_at')
+    
+    # Pagination
+    paginator = Paginator(alerts, 20)
+    page_obj = paginator.get_page(request.GET.get('page'))
     
     # Get user's communities
     user_communities = user.communities.filter(is_active=True)
     
     context = {
-        'alerts': alerts,
+        'page_obj': page_obj,
         'user_communities': user_communities,
     }
     return render(request, 'community/my_community_alerts.html', context)
 
 
-@login_required
-@require_POST
-def test_notification(request):
-    """Test notification endpoint for user profile"""
-    try:
-        # Simulate sending a test notification
-        user = request.user
-        
-        # Check user's notification preferences
-        if not user.email_notifications and not user.push_notifications:
-            return JsonResponse({
-                'success': False,
-                'error': 'No notification methods enabled. Please enable email or push notifications first.'
-            })
-        
-        # Simulate notification sending
-        notification_status = []
-        if user.email_notifications:
-            notification_status.append('Email notification sent')
-        if user.push_notifications:
-            notification_status.append('Push notification sent')
-        
-        return JsonResponse({
-            'success': True,
-            'message': 'Test notification sent successfully!',
-            'notification_status': ', '.join(notification_status)
-        })
-        
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'error': f'Failed to send test notification: {str(e)}'
-        })
-
-
 @login_required
 @require_POST
 def debug_headers(request):
     """Debug endpoint to check request headers"""
+    if not settings.DEBUG:
+        raise Http404()
+    
     return JsonResponse({
         'method': request.method,
         'content_type': request.content_type,
@@ -513,7 +523,7 @@ def admin_dashboard(request):
         'total_categories': AlertCategory.objects.count(),
         'total_alerts': Alert.objects.count(),
         'active_alerts': Alert.objects.filter(status='active').count(),
-        'recent_alerts': Alert.objects.select_related('community', 'category', 'created_by').order_by('-created_at')[:5],
+        'recent_alerts': Alert.objects.with_related().order_by('-created_at')[:5],
         'recent_users': CustomUser.objects.order_by('-date_joined')[:5],
         'admin_count': CustomUser.objects.filter(role='admin').count(),
         'moderator_count': CustomUser.objects.filter(role='moderator').count(),
@@ -36,8 +36,9 @@ class PushNotificationService:
         try:
             device, created = PushNotificationDevice.objects.update_or_create(
                 user=user,
-                device_token=device_token,
+                device_token_hash=PushNotificationDevice.hash_token(device_token),
                 defaults={
+                    'device_token': device_token,
                     'device_type': device_type,
                     'device_name': device_name,
                     'is_active': True,
@@ -61,7 +62,7 @@ class PushNotificationService:
         try:
             PushNotificationDevice.objects.filter(
                 user=user,
-                device_token=device_token
+                device_token_hash=PushNotificationDevice.hash_token(device_token)
             ).delete()
             
             logger.info(f"Unregistered device for {user.username}")
@@ -136,7 +137,7 @@ class PushNotificationService:
             # Clean up invalid tokens
             if failed_tokens:
                 PushNotificationDevice.objects.filter(
-                    device_token__in=failed_tokens
+                    device_token_hash__in=[PushNotificationDevice.hash_token(token) for token in failed_tokens]
                 ).update(is_active=False)
                 
                 logger.info(f"Deactivated {len(failed_tokens)} invalid device tokens")
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db import transaction
+
+from community.models import Alert
+
+try:
+    from celery import shared_task
+except ImportError:
+    shared_task = None
+
+
+def send_alert_notifications(alert_id):
+    """Fan out notifications for an alert; returns how many were sent"""
+    from .views import trigger_alert_notifications
+
+    alert = Alert.objects.select_related('community', 'category', 'created_by').filter(id=alert_id).first()
+    if alert is None:
+        return 0
+    return trigger_alert_notifications(alert)
+
+
+if shared_task is not None:
+    send_alert_notifications = shared_task(send_alert_notifications)
+
+
+def queue_alert_notifications(alert):
+    """
+    Hand an alert's notification fan-out to a Celery worker once the current
+    transaction commits, and return None. Without Celery or a broker the
+    notifications are sent inline and the count is returned.
+    """
+    if shared_task is not None and settings.CELERY_BROKER_URL:
+        transaction.on_commit(lambda: send_alert_notifications.delay(alert.pk))
+        return None
+
+    from .views import trigger_alert_notifications
+    return trigger_alert_notifications(alert)
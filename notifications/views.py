@@ -2,7 +2,7 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.conf import settings
 from django.utils import timezone
 from community.models import CustomUser, Alert, Notification, PushNotificationDevice
@@ -18,18 +18,18 @@ class NotificationService:
         """Send notification about new alert to community members"""
         try:
             # Find users who should be notified (community members)
-            users_to_notify = NotificationService.get_community_members(alert.community)
+            users_to_notify = list(NotificationService.get_community_members(alert.community))
             
             email_sent = 0
             push_sent = 0
             
+            # Email notifications are recorded in bulk and sent over one connection
+            if 'email' in notification_types:
+                email_sent = NotificationService.send_email_notifications(
+                    [user for user in users_to_notify if user.email_notifications], alert
+                )
+            
             for user in users_to_notify:
-                # Send email notification
-                if 'email' in notification_types and user.email_notifications:
-                    success = NotificationService.send_email_notification(user, alert)
-                    if success:
-                        email_sent += 1
-                
                 # Send push notification
                 if 'push' in notification_types and user.push_notifications:
                     success = NotificationService.send_push_notification(user, alert)
@@ -54,12 +54,9 @@ class NotificationService:
         )
     
     @staticmethod
-    def send_email_notification(user, alert):
-        """Send email notification to user about alert"""
-        try:
-            subject = f"[Community Alert] {alert.get_severity_display()}: {alert.title}"
-            
-            message = f"""
+    def email_message(user, alert):
+        """Plain-text body of the alert email for one user"""
+        return f"""
 Dear {user.get_full_name() or user.username},
 
 A new {alert.get_severity_display().lower()} security alert has been reported in your community:
@@ -87,39 +84,56 @@ View full details and community discussion at:
 Community Alert System - {alert.community.name}
 To adjust your notification preferences, visit your profile settings.
             """
-            
-            # Create notification record
-            notification = Notification.objects.create(
-                alert=alert,
-                user=user,
-                notification_type='email',
-                title=subject,
-                message=message,
-                status='pending'
+    
+    @staticmethod
+    def send_email_notifications(users, alert):
+        """Email users about an alert; returns how many were sent"""
+        if not users:
+            return 0
+        
+        subject = f"[Community Alert] {alert.get_severity_display()}: {alert.title}"
+        
+        if not (settings.EMAIL_HOST_USER and settings.EMAIL_HOST_PASSWORD):
+            # Record the attempt without building every message body
+            Notification.broadcast(
+                alert, users, 'email', subject,
+                "Email configuration not available", status='failed'
             )
-            
-            # Send email (only if email settings are configured)
-            if settings.EMAIL_HOST_USER and settings.EMAIL_HOST_PASSWORD:
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[user.email],
-                    fail_silently=False
-                )
-                
-                notification.status = 'sent'
-                notification.sent_at = timezone.now()
-            else:
-                notification.status = 'failed'
-                notification.message = "Email configuration not available"
-                
-            notification.save()
-            return notification.status == 'sent'
-            
+            return 0
+        
+        # Create notification records in batched INSERTs
+        notifications = Notification.broadcast(
+            alert, users, 'email', subject,
+            lambda user: NotificationService.email_message(user, alert), status='pending'
+        )
+        
+        # Send email over a single SMTP connection
+        sent = []
+        failed = []
+        try:
+            with get_connection() as connection:
+                for user, notification in zip(users, notifications):
+                    try:
+                        EmailMessage(
+                            subject=subject,
+                            body=notification.message,
+                            from_email=settings.DEFAULT_FROM_EMAIL,
+                            to=[user.email],
+                            connection=connection
+                        ).send()
+                        sent.append(notification.pk)
+                    except Exception as e:
+                        print(f"Failed to send email to {user.email}: {e}")
+                        failed.append(notification.pk)
         except Exception as e:
-            print(f"Failed to send email to {user.email}: {e}")
-            return False
+            # Opening or closing the SMTP connection failed; don't leave rows pending
+            print(f"Email connection failed: {e}")
+            done = set(sent)
+            failed = [notification.pk for notification in notifications if notification.pk not in done]
+        
+        Notification.objects.filter(pk__in=sent).update(status='sent', sent_at=timezone.now())
+        Notification.objects.filter(pk__in=failed).update(status='failed')
+        return len(sent)
     
     @staticmethod
     def send_push_notification(user, alert):